@@ -1,26 +1,94 @@
 #!/usr/bin/env python3
 """Simple webhook receiver for *Arr notifications"""
-from http.server import HTTPServer, BaseHTTPRequestHandler
-import json, os
-
-class WebhookHandler(BaseHTTPRequestHandler):
-    def do_POST(self):
-        length = int(self.headers.get('Content-Length', 0))
-        body = self.rfile.read(length).decode()
-        data = json.loads(body)
-        
-        # Extract event info
-        event_type = data.get('eventType', 'Unknown')
-        series = data.get('series', {}).get('title') or data.get('movie', {}).get('title', 'Unknown')
-        
-        # Send notification
-        os.system(f'bash scripts/phase2/send_alert.sh info "Media Ready" "{series} is ready to watch!"')
-        
-        self.send_response(200)
-        self.end_headers()
-        
-    def log_message(self, format, *args):
-        pass  # Quiet logging
+import asyncio, signal, subprocess
+
+try:
+    from orjson import loads  # Parses bytes directly, much faster than stdlib json
+except ImportError:
+    from json import loads  # Also accepts bytes (UTF-8) since Python 3.6
+
+try:
+    import uvloop  # Optional, faster event loop
+except ImportError:
+    uvloop = None
+
+RESPONSES = {
+    200: b'HTTP/1.1 200 OK\r\nContent-Length: 0\r\nConnection: close\r\n\r\n',
+    400: b'HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\nConnection: close\r\n\r\n',
+    501: b'HTTP/1.1 501 Not Implemented\r\nContent-Length: 0\r\nConnection: close\r\n\r\n',
+    503: b'HTTP/1.1 503 Service Unavailable\r\nContent-Length: 0\r\nConnection: close\r\n\r\n',
+}
+
+MAX_HEADER_SIZE = 65536
+
+def notify(data):
+    # Extract event info
+    event_type = data.get('eventType', 'Unknown')
+    series = data.get('series', {}).get('title') or data.get('movie', {}).get('title', 'Unknown')
+
+    # Send notification (argv list, no shell: titles come from untrusted JSON)
+    subprocess.Popen(
+        ['bash', 'scripts/phase2/send_alert.sh', 'info', 'Media Ready', f'{series} is ready to watch!'],
+        stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        close_fds=True)
+
+async def read_request(reader):
+    """Read one request, returning (head, body) with the header block split off via bytes.find"""
+    buf = b''
+    end = -1
+    while end < 0:
+        chunk = await reader.read(16384)
+        if not chunk:
+            raise asyncio.IncompleteReadError(buf, None)
+        start = max(len(buf) - 3, 0)  # Terminator may straddle two reads
+        buf += chunk
+        end = buf.find(b'\r\n\r\n', start)
+        if end < 0 and len(buf) > MAX_HEADER_SIZE:
+            raise ValueError('header block too large')
+    head, body = buf[:end], buf[end + 4:]
+
+    length = 0
+    pos = head.lower().find(b'\r\ncontent-length:')
+    if pos >= 0:
+        eol = head.find(b'\r\n', pos + 2)
+        length = int(head[pos + 17:eol if eol >= 0 else len(head)])
+    if length > len(body):
+        body += await reader.readexactly(length - len(body))
+    return head, body[:length]
+
+async def handle_webhook(reader, writer):
+    status = 400
+    try:
+        try:
+            head, body = await read_request(reader)
+            if not head.startswith(b'POST '):
+                status = 501
+            else:
+                data = loads(body)
+                # Fork off the event loop so a slow spawn doesn't stall other connections
+                await asyncio.get_running_loop().run_in_executor(None, notify, data)
+                status = 200
+        except (asyncio.IncompleteReadError, ValueError, AttributeError):
+            pass  # Malformed request
+        except ConnectionError:
+            return  # Client went away
+        except OSError:
+            status = 503  # Couldn't spawn the alert (EAGAIN, ENOMEM, ...)
+        writer.write(RESPONSES[status])
+        await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+async def main():
+    server = await asyncio.start_server(handle_webhook, '0.0.0.0', 8090)
+    async with server:
+        await server.serve_forever()
 
 if __name__ == '__main__':
-    HTTPServer(('0.0.0.0', 8090), WebhookHandler).serve_forever()
+    if uvloop:
+        uvloop.install()
+    # Alerts are fire-and-forget; let the kernel reap them instead of leaving zombies
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    asyncio.run(main())
@@ -11,23 +11,39 @@ Configures:
 Requirements:
 - Python 3.7+
 - requests library: pip3 install requests
+- orjson (optional, faster JSON encoding): pip3 install orjson
 - API keys in .env file
 """
 
 import os
+import re
 import sys
 import json
 import time
 import argparse
-from typing import Dict, Optional, List
+import threading
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, List, NamedTuple, Union
 from pathlib import Path
+from urllib.parse import urlsplit
 
 try:
     import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
 except ImportError:
     print("Error: 'requests' library not found. Install with: pip3 install requests")
     sys.exit(1)
 
+try:
+    import orjson
+    _dumps = orjson.dumps
+except ImportError:
+    # Optional speedup only; stdlib json produces an equivalent body
+    def _dumps(data) -> bytes:
+        return json.dumps(data).encode()
+
 
 # Color codes for terminal output
 class Colors:
@@ -37,18 +53,32 @@ class Colors:
     NC = '\033[0m'  # No Color
 
 
+# Apps are configured concurrently; keep each log line atomic
+_log_lock = threading.Lock()
+
+
 def log_info(msg: str):
-    print(f"{Colors.GREEN}[INFO]{Colors.NC} {msg}")
+    with _log_lock:
+        print(f"{Colors.GREEN}[INFO]{Colors.NC} {msg}")
 
 
 def log_warn(msg: str):
-    print(f"{Colors.YELLOW}[WARN]{Colors.NC} {msg}")
+    with _log_lock:
+        print(f"{Colors.YELLOW}[WARN]{Colors.NC} {msg}")
 
 
 def log_error(msg: str):
-    print(f"{Colors.RED}[ERROR]{Colors.NC} {msg}")
+    with _log_lock:
+        print(f"{Colors.RED}[ERROR]{Colors.NC} {msg}")
+
 
+# KEY=value lines; skips comments and blank lines, trims surrounding whitespace
+# (including \r). [^\S\n] is whitespace other than newline, so an empty value
+# can't swallow the next line.
+_ENV_RE = re.compile(r'^[^\S\n]*([^#=\s][^=\n]*?)[^\S\n]*=[^\S\n]*(.*?)[^\S\n]*$', re.M)
 
+
+@functools.lru_cache(maxsize=1)
 def load_env() -> Dict[str, str]:
     """Load environment variables from .env file."""
     env_file = Path(".env")
@@ -56,15 +86,52 @@ def load_env() -> Dict[str, str]:
         log_error(".env file not found. Copy .env.sample and configure.")
         sys.exit(1)
 
-    env_vars = {}
-    with open(env_file) as f:
-        for line in f:
-            line = line.strip()
-            if line and not line.startswith('#') and '=' in line:
-                key, value = line.split('=', 1)
-                env_vars[key.strip()] = value.strip()
-
-    return env_vars
+    return dict(_ENV_RE.findall(env_file.read_text()))
+
+
+def _make_session(max_retries) -> requests.Session:
+    """Build an HTTP session shared by every ArrApp."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=32, max_retries=max_retries)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+# Reuse connections and ride out transient 5xx while services warm up
+_SESSION = _make_session(Retry(total=5, backoff_factor=0.2, status_forcelist=[502, 503, 504]))
+# Readiness probes must fail fast; wait_for_ready does its own retrying
+_PROBE_SESSION = _make_session(0)
+
+# RdtClient download client payload; host, port and category are filled in per app
+_RDT_CLIENT_TEMPLATE = {
+    "enable": True,
+    "protocol": "torrent",
+    "priority": 1,
+    "removeCompletedDownloads": True,
+    "removeFailedDownloads": True,
+    "name": "RdtClient",
+    "implementationName": "qBittorrent",
+    "implementation": "QBittorrent",
+    "configContract": "QBittorrentSettings",
+    "tags": []
+}
+
+_RDT_CLIENT_FIELDS = (
+    ("host", None),
+    ("port", None),
+    ("useSsl", False),
+    ("urlBase", ""),
+    ("username", ""),
+    ("password", ""),
+    ("category", None),
+    ("postImportCategory", ""),
+    ("recentPriority", 0),
+    ("olderPriority", 0),
+    ("initialState", 0),
+    ("sequentialOrder", False),
+    ("firstAndLast", False),
+)
 
 
 class ArrApp:
@@ -73,56 +140,81 @@ class ArrApp:
     def __init__(self, name: str, url: str, api_key: Optional[str]):
         self.name = name
         self.url = url.rstrip('/')
+        self._base = self.url + "/api/v3/"
+        self._status_url = self._base + "system/status"
         self.api_key = api_key
-        self.session = requests.Session()
-        self.session.headers.update({
+        self._cache: Dict[str, List] = {}
+        # Sent per request since the session is shared by all apps
+        self.headers = {
             'X-Api-Key': api_key or '',
             'Content-Type': 'application/json'
-        })
+        }
 
-    def get(self, endpoint: str) -> Optional[Dict]:
-        """Make GET request to API."""
-        try:
-            resp = self.session.get(f"{self.url}/api/v3/{endpoint}", timeout=10)
-            resp.raise_for_status()
-            return resp.json()
-        except requests.exceptions.RequestException as e:
-            log_error(f"{self.name} GET {endpoint} failed: {e}")
-            return None
+    def _request(self, method: str, endpoint: str, parse: bool = True, **kwargs) -> Union[Dict, bool, None]:
+        """Make a request to the API.
 
-    def post(self, endpoint: str, data: Dict) -> Optional[Dict]:
-        """Make POST request to API."""
+        Returns the decoded body (or True if parse is False), or None on failure.
+        """
         try:
-            resp = self.session.post(f"{self.url}/api/v3/{endpoint}", json=data, timeout=10)
+            resp = _SESSION.request(method, self._base + endpoint,
+                                    headers=self.headers, timeout=10, **kwargs)
             resp.raise_for_status()
-            return resp.json()
-        except requests.exceptions.RequestException as e:
-            log_error(f"{self.name} POST {endpoint} failed: {e}")
+            if method == 'POST':
+                self._cache.pop(endpoint, None)
+            if not parse:
+                return True
+            # rootfolder and friends may answer 201/204 with no body
+            return resp.json() if resp.content else {}
+        except (requests.exceptions.RequestException, ValueError) as e:
+            # ValueError: non-JSON body on requests versions before 2.27
+            log_error(f"{self.name} {method} {endpoint} failed: {e}")
             return None
 
+    def get(self, endpoint: str) -> Optional[Dict]:
+        """Make GET request to API."""
+        return self._request('GET', endpoint)
+
+    def post(self, endpoint: str, data: Dict, parse: bool = False) -> Union[Dict, bool, None]:
+        """Make POST request to API. Only decodes the response body if parse is set."""
+        return self._request('POST', endpoint, parse=parse, data=_dumps(data))
+
     def put(self, endpoint: str, data: Dict) -> Optional[Dict]:
         """Make PUT request to API."""
-        try:
-            resp = self.session.put(f"{self.url}/api/v3/{endpoint}", json=data, timeout=10)
-            resp.raise_for_status()
-            return resp.json()
-        except requests.exceptions.RequestException as e:
-            log_error(f"{self.name} PUT {endpoint} failed: {e}")
-            return None
+        return self._request('PUT', endpoint, data=_dumps(data))
+
+    def _get_cached(self, endpoint: str) -> Optional[List]:
+        """GET a list endpoint, reusing the last successful result until it is POSTed to."""
+        if endpoint not in self._cache:
+            result = self.get(endpoint)
+            if result is None:
+                return None
+            self._cache[endpoint] = result
+        return self._cache[endpoint]
+
+    def prefetch(self, endpoints: List[str]) -> Dict[str, Optional[List]]:
+        """Fetch several list endpoints concurrently and seed the cache with them."""
+        with ThreadPoolExecutor(max_workers=len(endpoints)) as executor:
+            return dict(zip(endpoints, executor.map(self._get_cached, endpoints)))
 
     def wait_for_ready(self, timeout: int = 60) -> bool:
         """Wait for application to be ready."""
         log_info(f"Waiting for {self.name} to be ready...")
         start = time.time()
+        delay = 0.1  # Poll densely at first, backing off to every 2s
         while time.time() - start < timeout:
             try:
-                resp = self.session.get(f"{self.url}/api/v3/system/status", timeout=5)
+                # Only the status code matters; don't download the status body.
+                # *Arr apps don't route HEAD, so use a streamed GET instead.
+                resp = _PROBE_SESSION.get(self._status_url, headers=self.headers,
+                                          timeout=1, stream=True)
+                resp.close()
                 if resp.status_code == 200:
                     log_info(f"✓ {self.name} is ready")
                     return True
             except requests.exceptions.RequestException:
                 pass
-            time.sleep(2)
+            time.sleep(delay)
+            delay = min(delay * 2, 2.0)
 
         log_error(f"{self.name} not ready after {timeout}s")
         return False
@@ -130,7 +222,7 @@ class ArrApp:
     def add_download_client(self, rdt_url: str, category: str) -> bool:
         """Add RdtClient as qBittorrent download client."""
         # Check if already exists
-        clients = self.get("downloadclient")
+        clients = self._get_cached("downloadclient")
         if clients:
             for client in clients:
                 if client.get('name') == 'RdtClient':
@@ -138,32 +230,12 @@ class ArrApp:
                     return True
 
         # Add new download client
+        rdt = urlsplit(rdt_url)
+        fields = {"host": rdt.hostname, "port": rdt.port, "category": category}
         client_config = {
-            "enable": True,
-            "protocol": "torrent",
-            "priority": 1,
-            "removeCompletedDownloads": True,
-            "removeFailedDownloads": True,
-            "name": "RdtClient",
-            "fields": [
-                {"name": "host", "value": rdt_url.replace("http://", "").split(":")[0]},
-                {"name": "port", "value": int(rdt_url.split(":")[-1])},
-                {"name": "useSsl", "value": False},
-                {"name": "urlBase", "value": ""},
-                {"name": "username", "value": ""},
-                {"name": "password", "value": ""},
-                {"name": "category", "value": category},
-                {"name": "postImportCategory", "value": ""},
-                {"name": "recentPriority", "value": 0},
-                {"name": "olderPriority", "value": 0},
-                {"name": "initialState", "value": 0},
-                {"name": "sequentialOrder", "value": False},
-                {"name": "firstAndLast", "value": False}
-            ],
-            "implementationName": "qBittorrent",
-            "implementation": "QBittorrent",
-            "configContract": "QBittorrentSettings",
-            "tags": []
+            **_RDT_CLIENT_TEMPLATE,
+            "fields": [{"name": name, "value": fields.get(name, default)}
+                       for name, default in _RDT_CLIENT_FIELDS],
         }
 
         result = self.post("downloadclient", client_config)
@@ -175,7 +247,7 @@ class ArrApp:
     def add_root_folder(self, path: str) -> bool:
         """Add root folder for media."""
         # Check if already exists
-        folders = self.get("rootfolder")
+        folders = self._get_cached("rootfolder")
         if folders:
             for folder in folders:
                 if folder.get('path') == path:
@@ -192,7 +264,7 @@ class ArrApp:
     def add_remote_path_mapping(self, host: str, remote_path: str, local_path: str) -> bool:
         """Add remote path mapping."""
         # Check if already exists
-        mappings = self.get("remotePathMapping")
+        mappings = self._get_cached("remotePathMapping")
         if mappings:
             for mapping in mappings:
                 if mapping.get('host') == host:
@@ -213,95 +285,62 @@ class ArrApp:
         return False
 
 
-def configure_sonarr(env: Dict[str, str], dry_run: bool = False) -> bool:
-    """Configure Sonarr."""
-    log_info("=== Configuring Sonarr ===")
-
-    api_key = env.get('SONARR_API_KEY')
-    if not api_key:
-        log_warn("SONARR_API_KEY not set in .env, skipping Sonarr configuration")
-        log_warn("Get API key from Sonarr UI: Settings -> General -> Security -> API Key")
-        return False
-
-    sonarr = ArrApp("Sonarr", "http://localhost:8989", api_key)
-
-    if not sonarr.wait_for_ready():
-        return False
-
-    if dry_run:
-        log_info("[DRY RUN] Would configure Sonarr")
-        return True
-
-    # Add download client
-    sonarr.add_download_client("http://rdtclient:6500", "sonarr")
-
-    # Add root folder
-    sonarr.add_root_folder("/tv")
+class AppSpec(NamedTuple):
+    """Static settings for one *Arr application."""
+    name: str
+    url: str
+    env_key: str
+    root_folder: Optional[str]  # None for apps without media/download wiring
+    category: Optional[str]
 
-    # Add remote path mapping
-    sonarr.add_remote_path_mapping("rdtclient", "/data/downloads", "/data/downloads")
 
-    log_info("✓ Sonarr configuration complete")
-    return True
+_APPS = [
+    AppSpec("Sonarr", "http://localhost:8989", "SONARR_API_KEY", "/tv", "sonarr"),
+    AppSpec("Radarr", "http://localhost:7878", "RADARR_API_KEY", "/movies", "radarr"),
+    AppSpec("Prowlarr", "http://localhost:9696", "PROWLARR_API_KEY", None, None),
+]
 
 
-def configure_radarr(env: Dict[str, str], dry_run: bool = False) -> bool:
-    """Configure Radarr."""
-    log_info("=== Configuring Radarr ===")
+def configure_app(spec: AppSpec, env: Dict[str, str], dry_run: bool = False) -> bool:
+    """Configure a single *Arr application."""
+    log_info(f"=== Configuring {spec.name} ===")
 
-    api_key = env.get('RADARR_API_KEY')
+    api_key = env.get(spec.env_key)
     if not api_key:
-        log_warn("RADARR_API_KEY not set in .env, skipping Radarr configuration")
-        log_warn("Get API key from Radarr UI: Settings -> General -> Security -> API Key")
+        log_warn(f"{spec.env_key} not set in .env, skipping {spec.name} configuration")
+        log_warn(f"Get API key from {spec.name} UI: Settings -> General -> Security -> API Key")
         return False
 
-    radarr = ArrApp("Radarr", "http://localhost:7878", api_key)
+    app = ArrApp(spec.name, spec.url, api_key)
 
-    if not radarr.wait_for_ready():
+    if not app.wait_for_ready():
         return False
 
     if dry_run:
-        log_info("[DRY RUN] Would configure Radarr")
+        log_info(f"[DRY RUN] Would configure {spec.name}")
         return True
 
+    if spec.root_folder is None:
+        log_info(f"✓ {spec.name} is ready")
+        log_info("  Manual steps required:")
+        log_info("  1. Add indexers via Prowlarr UI")
+        log_info("  2. Add Sonarr app: Settings -> Apps -> Add -> Sonarr")
+        log_info("  3. Add Radarr app: Settings -> Apps -> Add -> Radarr")
+        return True
+
+    # Existence checks are independent, so load them all up front
+    app.prefetch(["downloadclient", "rootfolder", "remotePathMapping"])
+
     # Add download client
-    radarr.add_download_client("http://rdtclient:6500", "radarr")
+    app.add_download_client("http://rdtclient:6500", spec.category)
 
     # Add root folder
-    radarr.add_root_folder("/movies")
+    app.add_root_folder(spec.root_folder)
 
     # Add remote path mapping
-    radarr.add_remote_path_mapping("rdtclient", "/data/downloads", "/data/downloads")
-
-    log_info("✓ Radarr configuration complete")
-    return True
-
-
-def configure_prowlarr(env: Dict[str, str], dry_run: bool = False) -> bool:
-    """Configure Prowlarr."""
-    log_info("=== Configuring Prowlarr ===")
-
-    api_key = env.get('PROWLARR_API_KEY')
-    if not api_key:
-        log_warn("PROWLARR_API_KEY not set in .env, skipping Prowlarr configuration")
-        log_warn("Get API key from Prowlarr UI: Settings -> General -> Security -> API Key")
-        return False
-
-    prowlarr = ArrApp("Prowlarr", "http://localhost:9696", api_key)
-
-    if not prowlarr.wait_for_ready():
-        return False
-
-    if dry_run:
-        log_info("[DRY RUN] Would configure Prowlarr")
-        return True
-
-    log_info("✓ Prowlarr is ready")
-    log_info("  Manual steps required:")
-    log_info("  1. Add indexers via Prowlarr UI")
-    log_info("  2. Add Sonarr app: Settings -> Apps -> Add -> Sonarr")
-    log_info("  3. Add Radarr app: Settings -> Apps -> Add -> Radarr")
+    app.add_remote_path_mapping("rdtclient", "/data/downloads", "/data/downloads")
 
+    log_info(f"✓ {spec.name} configuration complete")
     return True
 
 
@@ -323,22 +362,14 @@ def main():
         log_warn("DRY RUN MODE - No changes will be made")
         log_info("")
 
-    success = True
-
-    if args.app in ['sonarr', 'all']:
-        if not configure_sonarr(env, args.dry_run):
-            success = False
-        log_info("")
+    specs = [spec for spec in _APPS if args.app in ('all', spec.name.lower())]
 
-    if args.app in ['radarr', 'all']:
-        if not configure_radarr(env, args.dry_run):
-            success = False
-        log_info("")
+    # Apps are independent services, so wait on them in parallel
+    with ThreadPoolExecutor(max_workers=len(specs)) as executor:
+        results = list(executor.map(lambda spec: configure_app(spec, env, args.dry_run), specs))
+    log_info("")
 
-    if args.app in ['prowlarr', 'all']:
-        if not configure_prowlarr(env, args.dry_run):
-            success = False
-        log_info("")
+    success = all(results)
 
     if success:
         log_info("✓ Configuration complete!")